@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the NumPy counting kernel of Code Line Counter
+
+Checks that decode_source picks the right encoding for BOM, BOM-less and
+stray-NUL files, and that count_content_numpy gives the same counts as the
+regex engine for every extension the kernel supports. Then times both
+engines on large generated files.
+
+Usage: python benchmark.py [--fuzz N] [--sizes KIB [KIB ...]]
+"""
+
+import os
+import re
+import sys
+import random
+import timeit
+import argparse
+
+import code_counter
+from code_counter import (COMMENT_PATTERNS, NUMPY_COMMENT_TOKENS, count_content, count_content_numpy,
+                          count_content_regex, decode_source)
+
+# Building blocks for the random inputs of the equivalence check
+FUZZ_PIECES = ['\n', ' ', '\t', '\x0b', '\x0c', '\x1c', '\x1f', '\x01', 'a', 'x = 1', '-', '/', '*']
+
+def comment_pieces(ext):
+    """Collect the literal comment delimiters of an extension's patterns"""
+    pieces = []
+    for pattern in COMMENT_PATTERNS[ext]:
+        pieces.extend(part for part in re.split(r'\.\*\??', pattern.replace('\\', '')) if part)
+    return pieces
+
+def decoding_cases(text):
+    """Build (name, source text, raw bytes, expected encoding, expected method) cases"""
+    cases = []
+    for encoding in ['utf-16-le', 'utf-16-be', 'utf-32-le', 'utf-32-be']:
+        cases.append((f"{encoding} without BOM", text, text.encode(encoding), encoding, 'guessed'))
+    for bom, encoding in code_counter.ENCODING_BOMS:
+        codec = 'utf-8' if encoding == 'utf-8-sig' else encoding
+        cases.append((f"{encoding} with BOM", text, bom + text.encode(codec), encoding, 'bom'))
+
+    # A stray NUL must not make a file look like UTF-16
+    ascii_nul = text + 'NUL = "\x00"\n'
+    utf8_nul = ascii_nul + '# caf\u00e9\n'
+    latin1 = text + '# caf\u00e9\n'
+    cases.append(("ASCII with a stray NUL", ascii_nul, ascii_nul.encode('ascii'), 'ascii', 'ascii'))
+    cases.append(("UTF-8 with a stray NUL", utf8_nul, utf8_nul.encode('utf-8'), 'utf-8', 'utf-8'))
+    cases.append(("latin-1 fallback", latin1, latin1.encode('latin-1'), 'latin-1', 'fallback'))
+    return cases
+
+def check_decoding():
+    """Check encoding decisions and that decoded files count like their source text"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'example.py'), encoding='utf-8') as file:
+        text = file.read()
+
+    cases = decoding_cases(text)
+    failures = 0
+    for name, source, raw, expected_encoding, expected_method in cases:
+        content, encoding, method = decode_source(raw)
+        counts = count_content(content, '.py')
+        expected_counts = count_content_regex(source, '.py')
+
+        if (encoding, method) != (expected_encoding, expected_method) or counts != expected_counts:
+            failures += 1
+            print(f"  {name}: got {encoding} ({method}) {counts}, "
+                  f"expected {expected_encoding} ({expected_method}) {expected_counts}")
+
+    print(f"Decoding: {len(cases) - failures}/{len(cases)} cases decoded as expected")
+    return failures == 0
+
+def check_equivalence(count, seed=0):
+    """Compare both engines on random inputs for every supported extension"""
+    rng = random.Random(seed)
+    mismatches = 0
+
+    for ext in sorted(NUMPY_COMMENT_TOKENS):
+        alphabet = FUZZ_PIECES + comment_pieces(ext)
+        for _ in range(count):
+            content = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))).encode('ascii')
+            if count_content_numpy(content, ext) != count_content_regex(content, ext):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  Mismatch for {ext}: {content!r}")
+
+    total = count * len(NUMPY_COMMENT_TOKENS)
+    print(f"Equivalence: {total - mismatches}/{total} random inputs match "
+          f"across {len(NUMPY_COMMENT_TOKENS)} extensions")
+    return mismatches == 0
+
+def sample_source(ext, size):
+    """Build ASCII source of the given size using the extension's comment token"""
+    with open(code_counter.__file__, 'rb') as file:
+        source = file.read()
+
+    tokens = NUMPY_COMMENT_TOKENS[ext]
+    if tokens:
+        source = source.replace(b'#', tokens[0])
+
+    return (source * (size // len(source) + 1))[:size]
+
+def time_engines(sizes):
+    """Print the time per file of both engines for each extension and size"""
+    print(f"\n{'Ext':8}{'Size':>10}{'NumPy':>12}{'Regex':>12}{'Speedup':>10}")
+    print("-" * 52)
+
+    for ext in ['.py', '.js', '.sh', '.sql', '.json']:
+        for size in sizes:
+            content = sample_source(ext, size * 1024)
+            number = max(1, 2 * 1024 * 1024 // len(content))
+
+            numpy_time = min(timeit.repeat(lambda: count_content_numpy(content, ext), number=number, repeat=3)) / number
+            regex_time = min(timeit.repeat(lambda: count_content_regex(content, ext), number=number, repeat=3)) / number
+
+            print(f"{ext:8}{size:>7} KiB{numpy_time * 1000:>10.2f}ms{regex_time * 1000:>10.2f}ms"
+                  f"{regex_time / numpy_time:>9.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NumPy counting kernel against the regex engine.')
+    parser.add_argument('--fuzz', type=int, default=2000, help='Random inputs to check per extension')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 256, 4096], help='File sizes to time, in KiB')
+    args = parser.parse_args()
+
+    if not check_decoding():
+        sys.exit(1)
+
+    if code_counter.np is None:
+        print("NumPy is not installed; install it with: pip install numpy")
+        sys.exit(1)
+
+    if not check_equivalence(args.fuzz):
+        sys.exit(1)
+
+    time_engines(args.sizes)
+
+# Main execution
+if __name__ == "__main__":
+    main()
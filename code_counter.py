@@ -9,9 +9,17 @@ import os
 import re
 import argparse
 import sys
+import codecs
+import json
+import subprocess
 from collections import defaultdict
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional and only speeds up counting large files
+    np = None
+
 # ANSI color codes for colorized terminal output
 COLORS = {
     'RESET': '\033[0m',
@@ -62,6 +70,54 @@ COMMENT_PATTERNS = {
 
 FILE_EXTENSIONS = list(COMMENT_PATTERNS.keys())
 
+# Byte order marks and the encodings they select. UTF-32 LE must be checked
+# before UTF-16 LE because its mark starts with the same two bytes.
+ENCODING_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+# Encoding used for files without a BOM that are not valid UTF-8
+DEFAULT_FALLBACK_ENCODING = 'latin-1'
+
+# Blank line patterns for decoded text and for raw ASCII bytes. The bytes
+# form lists the ASCII control characters that str-mode \s also matches.
+BLANK_LINE_PATTERNS = {
+    str: r'^\s*$',
+    bytes: rb'^[\s\x1c-\x1f]*$',
+}
+
+_ASCII_BYTES = bytes(range(128))
+
+# Number of leading bytes checked for NULs when guessing BOM-less UTF-16/32
+NUL_CHECK_BYTES = 4096
+
+# ASCII files at least this large are counted with the NumPy kernel
+NUMPY_MIN_BYTES = 8 * 1024
+
+def _literal_comment_tokens(patterns):
+    """Return the tokens of single-line patterns of the form '<literal>.*', or None"""
+    tokens = []
+    for pattern in patterns:
+        if '.*?' in pattern:
+            continue
+        match = re.match(r'^([^.^$*+?{}\[\]\\|()]+)\.\*$', pattern)
+        if not match:
+            return None
+        tokens.append(match.group(1).encode('ascii'))
+    return tokens
+
+# Single-line comment tokens per extension for the NumPy kernel. Extensions
+# whose patterns are not all literal tokens are left to the regex engine.
+NUMPY_COMMENT_TOKENS = {
+    ext: tokens for ext, tokens in
+    ((ext, _literal_comment_tokens(patterns)) for ext, patterns in COMMENT_PATTERNS.items())
+    if tokens is not None
+}
+
 # Language names for pretty output
 LANGUAGE_NAMES = {
     '.py': 'Python',
@@ -119,12 +175,99 @@ def colorize(text, color):
         return f"{COLORS.get(color, '')}{text}{COLORS['RESET']}"
     return text
 
-def count_lines(file_path):
+def is_ascii(raw):
+    """Check whether a byte string contains only 7-bit ASCII"""
+    if hasattr(raw, 'isascii'):  # Python 3.7+
+        return raw.isascii()
+    return not raw.translate(None, _ASCII_BYTES)
+
+def guess_wide_encoding(raw):
+    """
+    Guess the UTF-16/32 variant of a BOM-less file from where its NULs fall.
+    
+    Mostly-ASCII text in UTF-16 has a NUL in every other byte and UTF-32 has
+    three in every four; the offsets of those NULs give the byte order. A
+    few stray NULs, such as one inside a string literal, are not enough.
+    
+    Returns:
+        str: Encoding name, or None if NULs do not fill over half of the
+             bytes at the offsets a wide encoding would put them
+    """
+    head = raw[:NUL_CHECK_BYTES]
+    if b'\0' not in head:
+        return None
+    
+    # NUL counts per byte offset modulo 4
+    nuls = [head[offset::4].count(0) for offset in range(4)]
+    eighth = len(head) // 8
+    quarter = len(head) // 4
+    
+    if nuls[1] > eighth and nuls[2] > eighth:
+        if nuls[3] > eighth and nuls[0] <= eighth:
+            return 'utf-32-le'
+        if nuls[0] > eighth and nuls[3] <= eighth:
+            return 'utf-32-be'
+    if nuls[1] + nuls[3] > quarter:
+        return 'utf-16-le'
+    if nuls[0] + nuls[2] > quarter:
+        return 'utf-16-be'
+    return None
+
+def decode_source(raw, fallback=None):
+    """
+    Decode raw file contents for counting.
+    
+    Files starting with a BOM are decoded with the encoding it names. Files
+    with NUL bytes near the start are decoded as the UTF-16/32 variant
+    guessed from the NUL positions. Pure ASCII files are returned as bytes
+    without decoding, since the counting patterns work on bytes directly.
+    Anything else is decoded as UTF-8. Files that fail the guessed encoding
+    or UTF-8 are decoded with the fallback encoding.
+    
+    Args:
+        raw: File contents as bytes
+        fallback: Encoding for non-UTF-8 files without a BOM (default: latin-1)
+        
+    Returns:
+        tuple: (content, encoding, method) where content is bytes for ASCII
+               files and str otherwise, with line endings normalized to '\n'.
+               method tells how the encoding was chosen: 'bom', 'guessed',
+               'ascii', 'utf-8' or 'fallback'.
+    """
+    for bom, bom_encoding in ENCODING_BOMS:
+        if raw.startswith(bom):
+            content = raw[len(bom):].decode(bom_encoding, errors='replace')
+            encoding, method = bom_encoding, 'bom'
+            break
+    else:
+        # NUL bytes are ASCII too, so BOM-less wide encodings are checked first
+        wide_encoding = guess_wide_encoding(raw)
+        if wide_encoding is None and is_ascii(raw):
+            content, encoding, method = raw, 'ascii', 'ascii'
+        else:
+            try:
+                encoding = wide_encoding or 'utf-8'
+                method = 'guessed' if wide_encoding else 'utf-8'
+                content = raw.decode(encoding)
+            except UnicodeDecodeError:
+                encoding, method = fallback or DEFAULT_FALLBACK_ENCODING, 'fallback'
+                content = raw.decode(encoding, errors='replace')
+    
+    # Match the universal newline handling of text mode reads
+    cr, lf = (b'\r', b'\n') if isinstance(content, bytes) else ('\r', '\n')
+    if cr in content:
+        content = content.replace(cr + lf, lf).replace(cr, lf)
+    
+    return content, encoding, method
+
+def count_lines(file_path, encoding=None, encoding_log=None):
     """
     Count lines of code, ignoring comments and empty lines.
     
     Args:
         file_path: Path to the file to analyze
+        encoding: Fallback encoding for files that are not valid UTF-8
+        encoding_log: Optional dict that receives (encoding, method) per file
         
     Returns:
         tuple: (total_lines, code_lines, comment_lines, blank_lines)
@@ -133,50 +276,164 @@ def count_lines(file_path):
     
     # Handle files with no extension by trying to guess from content
     if not ext and os.path.isfile(file_path):
-        ext = guess_file_extension(file_path)
+        ext = guess_file_extension(file_path, encoding)
     
     if ext not in COMMENT_PATTERNS:
         return 0, 0, 0, 0
     
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+    with open(file_path, 'rb') as file:
         try:
-            content = file.read()
+            raw = file.read()
         except Exception as e:
             print(f"Error reading file {file_path}: {e}")
             return 0, 0, 0, 0
     
+    content, used_encoding, method = decode_source(raw, encoding)
+    if encoding_log is not None:
+        encoding_log[file_path] = (used_encoding, method)
+    
+    return count_content(content, ext)
+
+def count_content(content, ext):
+    """
+    Count lines of code in already decoded content.
+    
+    Large ASCII files are handed to the NumPy kernel when NumPy is installed;
+    both engines produce the same counts.
+    
+    Args:
+        content: File contents as str, or as bytes for pure ASCII files
+        ext: File extension used to select comment patterns
+        
+    Returns:
+        tuple: (total_lines, code_lines, comment_lines, blank_lines)
+    """
+    if (np is not None and isinstance(content, bytes) and len(content) >= NUMPY_MIN_BYTES
+            and ext in NUMPY_COMMENT_TOKENS):
+        return count_content_numpy(content, ext)
+    
+    return count_content_regex(content, ext)
+
+def count_content_regex(content, ext):
+    """
+    Count lines of code in already decoded content using regular expressions.
+    
+    Args:
+        content: File contents as str, or as bytes for pure ASCII files
+        ext: File extension used to select comment patterns
+        
+    Returns:
+        tuple: (total_lines, code_lines, comment_lines, blank_lines)
+    """
+    is_bytes = isinstance(content, bytes)
+    newline, empty = (b'\n', b'') if is_bytes else ('\n', '')
+    
     # Count total lines
-    lines = content.split('\n')
+    lines = content.split(newline)
     total_lines = len(lines)
     
     # Count blank lines
-    blank_lines = len(re.findall(r'^\s*$', content, re.MULTILINE))
+    blank_lines = len(re.findall(BLANK_LINE_PATTERNS[type(content)], content, re.MULTILINE))
     
     # Remove multi-line comments first (non-greedy matching)
     content_no_multiline = content
     for pattern in COMMENT_PATTERNS[ext]:
         if '.*?' in pattern:  # Multi-line comment patterns contain non-greedy matching
-            content_no_multiline = re.sub(pattern, '', content_no_multiline, flags=re.DOTALL)
+            regex = pattern.encode('ascii') if is_bytes else pattern
+            content_no_multiline = re.sub(regex, empty, content_no_multiline, flags=re.DOTALL)
     
     # Count single-line comments 
     comment_lines = 0
     for pattern in COMMENT_PATTERNS[ext]:
         if '.*?' not in pattern:  # Single-line comment patterns don't have non-greedy matching
-            comment_lines += len(re.findall(pattern, content_no_multiline))
+            regex = pattern.encode('ascii') if is_bytes else pattern
+            comment_lines += len(re.findall(regex, content_no_multiline))
     
     # Calculate code lines
     code_lines = total_lines - blank_lines - comment_lines
     
     return total_lines, code_lines, comment_lines, blank_lines
 
-def guess_file_extension(file_path):
+def count_content_numpy(content, ext):
+    """
+    Count lines of code in ASCII content using vectorized NumPy operations.
+    
+    Blank lines are counted the way the MULTILINE '^\\s*$' regex counts them:
+    once per run of blank lines, plus once more when a run of several blank
+    lines ends in an empty line. Single-line comments are counted as lines
+    containing the comment token, which is what findall of '<token>.*' does.
+    
+    Args:
+        content: Pure ASCII file contents as bytes with '\\n' line endings
+        ext: File extension with an entry in NUMPY_COMMENT_TOKENS
+        
+    Returns:
+        tuple: (total_lines, code_lines, comment_lines, blank_lines)
+    """
+    data = np.frombuffer(content, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 10)
+    total_lines = len(newlines) + 1
+    
+    # Whitespace is \t-\r, \x1c-\x1f and space, as in BLANK_LINE_PATTERNS[bytes]
+    non_space = (data > 32) | ((data < 28) & ((data < 9) | (data > 13)))
+    
+    # A line is blank when it holds no non-whitespace bytes. Each segment
+    # passed to reduceat runs to the next line start, so it is never empty;
+    # a trailing empty line after the final newline has no segment.
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    segments = total_lines if starts[-1] < len(data) else total_lines - 1
+    blank = np.ones(total_lines, dtype=bool)
+    if segments:
+        blank[:segments] = ~np.logical_or.reduceat(non_space, starts[:segments])
+    empty = ends == starts
+    
+    prev_blank = np.concatenate(([False], blank[:-1]))
+    next_blank = np.concatenate((blank[1:], [False]))
+    run_starts = np.count_nonzero(blank & ~prev_blank)
+    empty_run_ends = np.count_nonzero(blank & ~next_blank & prev_blank & empty)
+    blank_lines = int(run_starts + empty_run_ends)
+    
+    # Multi-line comments are still removed with the regex engine
+    content_no_multiline = content
+    for pattern in COMMENT_PATTERNS[ext]:
+        if '.*?' in pattern:
+            content_no_multiline = re.sub(pattern.encode('ascii'), b'', content_no_multiline, flags=re.DOTALL)
+    
+    comment_lines = 0
+    data = np.frombuffer(content_no_multiline, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 10)
+    for token in NUMPY_COMMENT_TOKENS[ext]:
+        if len(data) < len(token):
+            continue
+        
+        # Mark every position where the token starts
+        hits = data[:len(data) - len(token) + 1] == token[0]
+        for offset in range(1, len(token)):
+            hits &= data[offset:len(data) - len(token) + 1 + offset] == token[offset]
+        
+        # Count the distinct lines containing a hit
+        lines = np.searchsorted(newlines, np.flatnonzero(hits))
+        if len(lines):
+            comment_lines += 1 + int(np.count_nonzero(np.diff(lines)))
+    
+    code_lines = total_lines - blank_lines - comment_lines
+    
+    return total_lines, code_lines, comment_lines, blank_lines
+
+def guess_file_extension(file_path, encoding=None):
     """Try to guess file type by examining file content"""
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+    with open(file_path, 'rb') as file:
         try:
-            first_lines = ''.join([file.readline() for _ in range(10)])
+            head = file.read(4096)
         except:
             return ''
     
+    content, _, _ = decode_source(head, encoding)
+    if isinstance(content, bytes):
+        content = content.decode('ascii')
+    first_lines = '\n'.join(content.split('\n')[:10])
+    
     # Check for shebang line
     if re.search(r'^#!.*python', first_lines):
         return '.py'
@@ -197,7 +454,8 @@ def guess_file_extension(file_path):
     
     return ''  # Unable to determine file type
 
-def analyze_directory(directory, extensions=None, exclude=None, follow_symlinks=False, max_depth=None, include_hidden=False):
+def analyze_directory(directory, extensions=None, exclude=None, follow_symlinks=False, max_depth=None, include_hidden=False,
+                      encoding=None, encoding_log=None):
     """
     Analyze all files in a directory recursively.
     
@@ -208,6 +466,8 @@ def analyze_directory(directory, extensions=None, exclude=None, follow_symlinks=
         follow_symlinks: Whether to follow symbolic links
         max_depth: Maximum depth to recurse into directories
         include_hidden: Whether to include hidden files and directories
+        encoding: Fallback encoding for files that are not valid UTF-8
+        encoding_log: Optional dict that receives (encoding, method) per file
         
     Returns:
         dict: Statistics per file extension
@@ -265,11 +525,11 @@ def analyze_directory(directory, extensions=None, exclude=None, follow_symlinks=
             
             # Try to determine file type for files without extension
             if not ext:
-                ext = guess_file_extension(file_path)
+                ext = guess_file_extension(file_path, encoding)
 
             if ext in extensions:
                 try:
-                    total, code, comment, blank = count_lines(file_path)
+                    total, code, comment, blank = count_lines(file_path, encoding, encoding_log)
                     
                     results[ext]['files'] += 1
                     results[ext]['total'] += total
@@ -301,6 +561,271 @@ def analyze_directory(directory, extensions=None, exclude=None, follow_symlinks=
     
     return results, total_results, skipped_files, elapsed_time
 
+def parse_history_stride(value):
+    """
+    Parse an --every value for history mode.
+    
+    A plain number samples every Nth commit, while a number followed by 'd'
+    or 'w' keeps at most one commit per that many days or weeks.
+    
+    Returns:
+        tuple: ('commits', n) or ('days', n)
+    """
+    match = re.match(r'^(\d+)([dw]?)$', value.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise argparse.ArgumentTypeError(f"invalid stride '{value}' (use e.g. 10, 7d or 2w)")
+    
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == 'w':
+        return 'days', amount * 7
+    elif unit == 'd':
+        return 'days', amount
+    return 'commits', amount
+
+def run_git(repo, *args, input=None):
+    """Run a git command in a repository and return its raw output"""
+    return subprocess.run(['git', '-C', repo] + list(args), input=input, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=True).stdout
+
+def list_history_commits(repo, max_commits=500, stride=None):
+    """
+    List the commits to analyze in history mode.
+    
+    Walks the first-parent history of HEAD that touches the given path.
+    
+    Args:
+        repo: Path inside a git work tree
+        max_commits: Number of most recent commits to walk
+        stride: Optional value from parse_history_stride used to sample commits
+        
+    Returns:
+        list: (commit_id, timestamp) tuples, oldest first
+    """
+    # Path limiting makes git diff every commit, so only use it below the top level
+    prefix = run_git(repo, 'rev-parse', '--show-prefix').strip()
+    pathspec = ['--', '.'] if prefix else []
+    output = run_git(repo, 'rev-list', '--first-parent', '--timestamp',
+                     f'--max-count={max_commits}', 'HEAD', *pathspec)
+    
+    commits = []
+    for line in output.decode('ascii').splitlines():
+        timestamp, commit = line.split()
+        commits.append((commit, int(timestamp)))
+    
+    # Sample from the newest commit backwards so HEAD is always included
+    if stride is not None:
+        unit, amount = stride
+        if unit == 'commits':
+            commits = commits[::amount]
+        else:
+            sampled = []
+            for commit, timestamp in commits:
+                if not sampled or sampled[-1][1] - timestamp >= amount * 86400:
+                    sampled.append((commit, timestamp))
+            commits = sampled
+    
+    commits.reverse()
+    return commits
+
+def history_file_ext(path, mode, extensions, exclude, include_hidden=False):
+    """
+    Get the extension of a tree entry counted in history mode.
+    
+    Files without an extension are skipped, since their type can only be
+    guessed from content.
+    
+    Returns:
+        str: The file extension, or None if the entry is not counted
+    """
+    # Skip deletions, submodules and symlinks
+    if not mode.startswith('100'):
+        return None
+    
+    parts = path.split('/')
+    if path in exclude or any(part in exclude for part in parts):
+        return None
+    if not include_hidden and any(part.startswith('.') for part in parts):
+        return None
+    
+    _, ext = os.path.splitext(parts[-1])
+    return ext if ext in extensions else None
+
+def list_tree_blobs(repo, commit):
+    """
+    List every file of a commit.
+    
+    Returns:
+        list: (path, mode, blob_id) tuples
+    """
+    entries = []
+    output = run_git(repo, 'ls-tree', '-r', '-z', commit)
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+        info, path = entry.split(b'\t', 1)
+        mode, _, blob_id = info.decode('ascii').split()
+        entries.append((path.decode('utf-8', errors='replace'), mode, blob_id))
+    
+    return entries
+
+def list_tree_changes(repo, commit_pairs):
+    """
+    List the files that differ between pairs of commits.
+    
+    All pairs are diffed by a single 'git diff-tree --stdin' process.
+    Deleted files are reported with mode '000000'.
+    
+    Args:
+        repo: Path inside a git work tree
+        commit_pairs: (old_commit, new_commit) tuples with distinct new commits
+        
+    Returns:
+        dict: new_commit -> list of (path, mode, blob_id) tuples with the new
+              mode and blob; commits without changes are left out
+    """
+    if not commit_pairs:
+        return {}
+    
+    # Each line is a commit followed by the commit to diff it against
+    lines = ''.join(f"{new_commit} {old_commit}\n" for old_commit, new_commit in commit_pairs)
+    output = run_git(repo, 'diff-tree', '--stdin', '-r', '-z', '--raw', '--no-renames', '--relative',
+                     input=lines.encode('ascii'))
+    
+    # Output is a commit id header followed by ':<meta>', '<path>' fields
+    changes = {}
+    fields = output.split(b'\0')
+    index = 0
+    while index < len(fields):
+        field = fields[index].decode('ascii')
+        if field.startswith(':'):
+            _, mode, _, blob_id, _ = field[1:].split()
+            path = fields[index + 1].decode('utf-8', errors='replace')
+            changes[commit].append((path, mode, blob_id))
+            index += 2
+        else:
+            if field:
+                commit = field
+                changes[commit] = []
+            index += 1
+    
+    return changes
+
+def read_blob(cat_file, blob_id):
+    """Read one object from a running 'git cat-file --batch' process"""
+    cat_file.stdin.write(blob_id.encode('ascii') + b'\n')
+    cat_file.stdin.flush()
+    
+    header = cat_file.stdout.readline().split()
+    if len(header) != 3:
+        raise ValueError(f"could not read blob {blob_id}")
+    
+    raw = cat_file.stdout.read(int(header[2]))
+    cat_file.stdout.read(1)  # Trailing newline
+    return raw
+
+def add_file_counts(results, total_results, ext, counts, sign=1):
+    """Add (or with sign=-1, remove) one file's line counts to running totals"""
+    total, code, comment, blank = counts
+    for stats in (results[ext], total_results):
+        stats['files'] += sign
+        stats['total'] += sign * total
+        stats['code'] += sign * code
+        stats['comments'] += sign * comment
+        stats['blank'] += sign * blank
+    
+    if results[ext]['files'] == 0:
+        del results[ext]
+
+def analyze_history(repo, extensions=None, exclude=None, max_commits=500, stride=None,
+                    include_hidden=False, encoding=None):
+    """
+    Analyze lines of code across the git history of a repository.
+    
+    The first sampled commit is listed in full. Each later commit is
+    diffed against the previous sample in a single diff-tree stream, and
+    only the changed files update the running totals. Counts are memoized
+    per blob, so each file version is only read and counted once.
+    
+    Args:
+        repo: Path inside a git work tree
+        extensions: List of file extensions to include
+        exclude: List of directories or files to exclude
+        max_commits: Number of most recent commits to walk
+        stride: Optional value from parse_history_stride used to sample commits
+        include_hidden: Whether to include hidden files and directories
+        encoding: Fallback encoding for files that are not valid UTF-8
+        
+    Returns:
+        tuple: (history, blobs_counted, elapsed_time) where history is a list
+               of dicts with 'commit', 'date', 'results' and 'total' keys
+    """
+    if extensions is None:
+        extensions = FILE_EXTENSIONS
+    
+    if exclude is None:
+        exclude = []
+    
+    start_time = datetime.now()
+    commits = list_history_commits(repo, max_commits, stride)
+    commit_ids = [commit for commit, _ in commits]
+    commit_changes = list_tree_changes(repo, list(zip(commit_ids, commit_ids[1:])))
+    
+    # Line counts keyed by (blob id, extension)
+    blob_counts = {}
+    # Counted files of the current commit, mapping path to (blob id, extension)
+    tree = {}
+    results = defaultdict(lambda: {'files': 0, 'total': 0, 'code': 0, 'comments': 0, 'blank': 0})
+    total_results = {'files': 0, 'total': 0, 'code': 0, 'comments': 0, 'blank': 0}
+    history = []
+    
+    cat_file = subprocess.Popen(['git', '-C', repo, 'cat-file', '--batch'],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        for index, (commit, timestamp) in enumerate(commits, 1):
+            if index == 1:
+                changes = list_tree_blobs(repo, commit)
+            else:
+                changes = commit_changes.get(commit, [])
+            
+            for path, mode, blob_id in changes:
+                old_key = tree.pop(path, None)
+                if old_key is not None:
+                    add_file_counts(results, total_results, old_key[1], blob_counts[old_key], -1)
+                
+                ext = history_file_ext(path, mode, extensions, exclude, include_hidden)
+                if ext is None:
+                    continue
+                
+                key = tree[path] = (blob_id, ext)
+                if key not in blob_counts:
+                    content, _, _ = decode_source(read_blob(cat_file, blob_id), encoding)
+                    blob_counts[key] = count_content(content, ext)
+                add_file_counts(results, total_results, ext, blob_counts[key])
+            
+            history.append({
+                'commit': commit,
+                'date': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+                'results': {ext: dict(data) for ext, data in results.items()},
+                'total': dict(total_results),
+            })
+            
+            # Print progress indicator for long histories
+            if index % 10 == 0:
+                sys.stdout.write(f"\rProcessing commits... {index}/{len(commits)}")
+                sys.stdout.flush()
+    finally:
+        cat_file.stdin.close()
+        cat_file.wait()
+    
+    # Clear progress indicator
+    if len(commits) >= 10:
+        sys.stdout.write("\r" + " " * 50 + "\r")
+        sys.stdout.flush()
+    
+    elapsed_time = (datetime.now() - start_time).total_seconds()
+    
+    return history, len(blob_counts), elapsed_time
+
 def print_results(results, total_results, elapsed_time=None, show_percentage=True, sort_by='code'):
     """Print analysis results in a formatted table"""
     headers = ["Extension", "Language", "Files", "Total", "Code", "Comments", "Blank"]
@@ -335,7 +860,7 @@ def print_results(results, total_results, elapsed_time=None, show_percentage=Tru
     print("-" * (sum(widths[:len(headers)])))
     
     # Print data rows
-    for ext, data in sorted_results:
+    for ext, data, _ in sorted_results:
         lang_name = LANGUAGE_NAMES.get(ext, ext)
         row = [
             colorize(ext, 'CYAN'),
@@ -406,6 +931,45 @@ def print_file_analysis(file_path, total, code, comment, blank):
         print(f"{colorize('Comment lines:', 'BLUE')} {comment} (0.0% of total)")
         print(f"{colorize('Blank lines:', 'YELLOW')} {blank} (0.0% of total)")
 
+def print_encoding_report(encoding_log, show_summary=False):
+    """Print the encodings used to decode files and warn about heuristic decodes"""
+    if not encoding_log:
+        return
+    
+    if show_summary:
+        counts = defaultdict(int)
+        for encoding, method in encoding_log.values():
+            counts[f"{encoding} ({method})"] += 1
+        
+        print(f"\n{colorize('Encodings:', 'BOLD')}")
+        for encoding, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {colorize(encoding, 'CYAN'):30} {count} files")
+    
+    # Guessed and fallback encodings are heuristic and may be wrong
+    uncertain_files = [(path, encoding, method) for path, (encoding, method) in encoding_log.items()
+                       if method in ('guessed', 'fallback')]
+    if uncertain_files:
+        print(f"\n{colorize('Note:', 'GRAY')} {len(uncertain_files)} files had no BOM and were not "
+              f"ASCII or UTF-8; their encoding was guessed or the fallback was used")
+        for file_path, encoding, method in uncertain_files[:5]:  # Show only first 5 files
+            print(f"  - {file_path}: {encoding} ({method})")
+        if len(uncertain_files) > 5:
+            print(f"  ... and {len(uncertain_files) - 5} more")
+
+def get_bar_color(ext):
+    """Pick the chart bar color for a file extension"""
+    if ext in ['.py', '.rb', '.pl']:
+        return 'BLUE'
+    elif ext in ['.js', '.ts', '.jsx', '.tsx']:
+        return 'YELLOW'
+    elif ext in ['.java', '.kt', '.scala']:
+        return 'RED'
+    elif ext in ['.c', '.cpp', '.h']:
+        return 'MAGENTA'
+    elif ext in ['.html', '.xml', '.css']:
+        return 'CYAN'
+    return 'GREEN'
+
 def generate_ascii_bar_chart(results, total_results, metric='code'):
     """Generate a simple ASCII bar chart for a specified metric"""
     sorted_results = sorted(results.items(), key=lambda x: x[1][metric], reverse=True)
@@ -424,21 +988,7 @@ def generate_ascii_bar_chart(results, total_results, metric='code'):
         lang_name = LANGUAGE_NAMES.get(ext, ext)
         lang_display = f"{lang_name} ({ext})"
         
-        # Define bar color based on extension
-        if ext in ['.py', '.rb', '.pl']:
-            bar_color = 'BLUE'
-        elif ext in ['.js', '.ts', '.jsx', '.tsx']:
-            bar_color = 'YELLOW'
-        elif ext in ['.java', '.kt', '.scala']:
-            bar_color = 'RED'
-        elif ext in ['.c', '.cpp', '.h']:
-            bar_color = 'MAGENTA'
-        elif ext in ['.html', '.xml', '.css']:
-            bar_color = 'CYAN'
-        else:
-            bar_color = 'GREEN'
-        
-        bar = colorize('#' * bar_length, bar_color)
+        bar = colorize('#' * bar_length, get_bar_color(ext))
         print(f"{lang_display:20} {bar} {data[metric]:6} ({percentage:5.1f}%)")
     
     if len(sorted_results) > 10:
@@ -504,6 +1054,112 @@ def export_csv(results, total_results, filename):
         print(f"\n{colorize('Error exporting to CSV:', 'RED')} {str(e)}")
         return False
 
+def print_history(history, elapsed_time=None, blobs_counted=None):
+    """Print per-commit totals of a history analysis"""
+    headers = ["Commit", "Date", "Files", "Total", "Code", "Comments", "Blank"]
+    widths = [10, 21, 8, 10, 10, 10, 10]
+    
+    header_row = "".join(f"{colorize(headers[i], 'BOLD'):{widths[i]}}" for i in range(len(headers)))
+    print(f"\n{header_row}")
+    print("-" * sum(widths))
+    
+    for entry in history:
+        data = entry['total']
+        row = [
+            colorize(entry['commit'][:8], 'CYAN'),
+            colorize(entry['date'], 'YELLOW'),
+            str(data['files']),
+            str(data['total']),
+            colorize(str(data['code']), 'GREEN'),
+            colorize(str(data['comments']), 'BLUE'),
+            str(data['blank'])
+        ]
+        print("".join(f"{col:{widths[i]}}" for i, col in enumerate(row)))
+    
+    if blobs_counted is not None:
+        print(f"\n{colorize('Commits analyzed:', 'GRAY')} {len(history)}, "
+              f"{colorize('unique blobs counted:', 'GRAY')} {blobs_counted}")
+    
+    if elapsed_time is not None:
+        print(f"{colorize('Analysis completed in:', 'GRAY')} {colorize(f'{elapsed_time:.2f} seconds', 'GREEN')}")
+
+def generate_history_chart(history, metric='code'):
+    """Generate an ASCII trend of a metric over commits, stacked by language"""
+    max_value = max((entry['total'][metric] for entry in history), default=0)
+    max_bar_length = 40
+    
+    if max_value == 0:
+        return
+    
+    # Stack languages in a fixed order, largest at the newest commit first
+    latest = history[-1]['results']
+    exts = sorted({ext for entry in history for ext in entry['results']},
+                  key=lambda ext: latest.get(ext, {}).get(metric, 0), reverse=True)
+    
+    print(f"\n{colorize('Trend of', 'BOLD')} {colorize(metric, 'CYAN')} {colorize('lines over history:', 'BOLD')}")
+    print()
+    
+    for entry in history:
+        bar = ''
+        cumulative = 0
+        for ext in exts:
+            value = entry['results'].get(ext, {}).get(metric, 0)
+            start = int(cumulative / max_value * max_bar_length)
+            cumulative += value
+            length = int(cumulative / max_value * max_bar_length) - start
+            if length > 0:
+                bar += colorize('#' * length, get_bar_color(ext))
+        
+        label = f"{entry['commit'][:8]} {entry['date'][:10]}"
+        padding = ' ' * (max_bar_length - int(cumulative / max_value * max_bar_length))
+        print(f"{label:20} {bar}{padding} {entry['total'][metric]:6}")
+    
+    legend = "  ".join(colorize(LANGUAGE_NAMES.get(ext, ext), get_bar_color(ext)) for ext in exts[:10])
+    print(f"\n{colorize('Languages:', 'GRAY')} {legend}")
+
+def export_history_csv(history, filename):
+    """Export a history analysis to a CSV file with one row per commit and extension"""
+    try:
+        with open(filename, 'w', newline='') as csvfile:
+            headers = ['Commit', 'Date', 'Extension', 'Language', 'Files', 'Total Lines', 'Code Lines',
+                       'Comment Lines', 'Blank Lines']
+            
+            csvfile.write(','.join(headers) + '\n')
+            
+            for entry in history:
+                for ext, data in sorted(entry['results'].items()):
+                    row = [
+                        entry['commit'],
+                        entry['date'],
+                        ext,
+                        LANGUAGE_NAMES.get(ext, ext),
+                        str(data['files']),
+                        str(data['total']),
+                        str(data['code']),
+                        str(data['comments']),
+                        str(data['blank'])
+                    ]
+                    
+                    csvfile.write(','.join([f'"{item}"' if ',' in item else item for item in row]) + '\n')
+        
+        print(f"\n{colorize('History exported to:', 'BOLD')} {colorize(filename, 'GREEN')}")
+        return True
+    except Exception as e:
+        print(f"\n{colorize('Error exporting to CSV:', 'RED')} {str(e)}")
+        return False
+
+def export_history_json(history, filename):
+    """Export a history analysis to a JSON file"""
+    try:
+        with open(filename, 'w') as jsonfile:
+            json.dump(history, jsonfile, indent=2)
+        
+        print(f"\n{colorize('History exported to:', 'BOLD')} {colorize(filename, 'GREEN')}")
+        return True
+    except Exception as e:
+        print(f"\n{colorize('Error exporting to JSON:', 'RED')} {str(e)}")
+        return False
+
 def main():
     parser = argparse.ArgumentParser(
         description='Count lines of code, ignoring comments and empty lines.',
@@ -521,9 +1177,27 @@ def main():
     parser.add_argument('--hidden', action='store_true', help='Include hidden files and directories')
     parser.add_argument('--chart', action='store_true', help='Show ASCII bar chart visualization')
     parser.add_argument('--csv', help='Export results to a CSV file')
+    parser.add_argument('--encoding', default=DEFAULT_FALLBACK_ENCODING,
+                       help='Fallback encoding for files without a BOM that are not valid UTF-8')
+    parser.add_argument('--show-encodings', action='store_true', help='Show the encodings used to decode files')
+    parser.add_argument('--history', action='store_true',
+                       help='Analyze lines of code over the git history of the repository at path '
+                            '(ignores --max-depth, --follow-links and --sort)')
+    parser.add_argument('--max-commits', type=int, default=500, help='History mode: number of recent commits to walk')
+    parser.add_argument('--every', type=parse_history_stride, metavar='STRIDE',
+                       help='History mode: sample every Nth commit, or one commit per N days/weeks (e.g. 10, 7d, 2w)')
+    parser.add_argument('--json', help='History mode: export the per-commit time series to a JSON file')
     
     args = parser.parse_args()
     
+    if args.json and not args.history:
+        parser.error("--json requires --history")
+    
+    try:
+        codecs.lookup(args.encoding)
+    except LookupError:
+        parser.error(f"unknown encoding: {args.encoding}")
+    
     # Set up color support
     global support_color
     support_color = not args.no_color and enable_windows_color()
@@ -533,19 +1207,47 @@ def main():
     exclude = args.exclude if args.exclude else []
     show_percentage = not args.no_percentage
     max_depth = args.max_depth
+    encoding_log = {}
     
-    if os.path.isfile(path):
+    if args.history:
+        print(f"\n{colorize('Analyzing history of:', 'BOLD')} {colorize(path, 'CYAN')}")
+        try:
+            history, blobs_counted, elapsed_time = analyze_history(
+                path, extensions, exclude, args.max_commits, args.every, args.hidden, args.encoding
+            )
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            error = e.stderr.decode(errors='replace').strip() if isinstance(e, subprocess.CalledProcessError) else str(e)
+            print(f"\n{colorize('Error during history analysis:', 'RED')} {error}")
+            print("Please check that git is installed and the path is inside a git repository.")
+            return
+        
+        if history:
+            print_history(history, elapsed_time, blobs_counted)
+            
+            if args.chart:
+                generate_history_chart(history, 'code')
+            
+            if args.csv:
+                export_history_csv(history, args.csv)
+            
+            if args.json:
+                export_history_json(history, args.json)
+        else:
+            print(f"\n{colorize('No commits were found.', 'RED')} Check that the path has git history.")
+    elif os.path.isfile(path):
         start_time = datetime.now()
-        total, code, comment, blank = count_lines(path)
+        total, code, comment, blank = count_lines(path, args.encoding, encoding_log)
         elapsed_time = (datetime.now() - start_time).total_seconds()
         if total > 0:  # Only print if the file had content
             print_file_analysis(path, total, code, comment, blank)
             print(f"\n{colorize('Analysis completed in:', 'GRAY')} {colorize(f'{elapsed_time:.2f} seconds', 'GREEN')}")
+            print_encoding_report(encoding_log, args.show_encodings)
     else:
         print(f"\n{colorize('Analyzing directory:', 'BOLD')} {colorize(path, 'CYAN')}")
         try:
             results, total_results, skipped_files, elapsed_time = analyze_directory(
-                path, extensions, exclude, args.follow_links, max_depth, args.hidden
+                path, extensions, exclude, args.follow_links, max_depth, args.hidden,
+                args.encoding, encoding_log
             )
             
             if total_results['files'] > 0:
@@ -564,6 +1266,8 @@ def main():
                         print(f"  - {file_path}: {error}")
                     if len(skipped_files) > 5:
                         print(f"  ... and {len(skipped_files) - 5} more")
+                
+                print_encoding_report(encoding_log, args.show_encodings)
             else:
                 print(f"\n{colorize('No files were analyzed.', 'RED')} Check your path and file extensions.")
         except Exception as e:
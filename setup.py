@@ -34,6 +34,9 @@ setup(
     keywords="code, lines, counter, comments, blank, analyzer, development, statistics",
     packages=find_packages(),
     python_requires=">=3.6",
+    extras_require={
+        "fast": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "code-counter=code_counter:main",